@@ -2,10 +2,20 @@
 Some helper functions for the library.
 """
 
-import math
+import bisect
+import functools
+import re
 from types import SimpleNamespace
 
 
+_RE_CAMEL1 = re.compile(r'(.)([A-Z][a-z]+)')
+_RE_CAMEL2 = re.compile(r'([a-z0-9])([A-Z])')
+
+_BYTE_DIMENSIONS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+# lower bounds of the dimensions following 'B' in _BYTE_DIMENSIONS
+_BYTE_THRESHOLDS = (1000, 1000 ** 2, 1000 ** 3, 1000 ** 4, 1000 ** 5)
+
+
 def byte_formatter(value):
     """
     Gets a large integer als value and returns a tuple with the value as
@@ -15,19 +25,11 @@ def byte_formatter(value):
     Expects positive integer as input. Negative numbers are interpreted
     as positive numbers. values < 1 are interpreted as 0.
     """
-    dim = ['B', 'KB', 'MB', 'GB', 'TB']
     value = abs(value)
     if value < 1:
-        log = 0
-        num = 0
-    else:
-        log = min(int(math.log10(value) / 3), len(dim))
-        num = value / 1000 ** log
-    try:
-        dimension = dim[log]
-    except IndexError:
-        dimension = 'PB'
-    return num, dimension
+        return 0, _BYTE_DIMENSIONS[0]
+    log = bisect.bisect_right(_BYTE_THRESHOLDS, value)
+    return value / 1000 ** log, _BYTE_DIMENSIONS[log]
 
 
 def format_num(num, unit='bytes'):
@@ -36,9 +38,8 @@ def format_num(num, unit='bytes'):
     If 'num' is bits, set unit='bits'.
     """
     num, dim = byte_formatter(num)
-    if unit != 'bytes':
-        dim += 'it'  # then its Bit by default
-    return f'{num:3.1f} {dim}'
+    suffix = 'it' if unit != 'bytes' else ''  # then its Bit by default
+    return f'{num:3.1f} {dim}{suffix}'
 
 
 def format_rate(num, unit='bytes'):
@@ -46,7 +47,9 @@ def format_rate(num, unit='bytes'):
     Returns a human-readable string of a byte/bits per second.
     If 'num' is bits, set unit='bits'.
     """
-    return format_num(num, unit=unit) + '/s'
+    num, dim = byte_formatter(num)
+    suffix = 'it/s' if unit != 'bytes' else '/s'
+    return f'{num:3.1f} {dim}{suffix}'
 
 
 def format_dB(num):
@@ -54,14 +57,59 @@ def format_dB(num):
     Returns a human-readable string of dB. The value is divided
     by 10 to get first decimal digit
     """
-    num /= 10
-    return f'{num:3.1f} {"dB"}'
+    return f'{num / 10:3.1f} dB'
+
+
+@functools.lru_cache(maxsize=512)
+def _rewrite_argument(name, suppress_new):
+    """
+    Cached implementation of `ArgumentNamespace.rewrite_argument`. The
+    router returns the same argument names over and over again, so the
+    conversion is done just once per name.
+    """
+    if name.lower() == name:
+        # no uppercase characters: nothing to convert
+        result = name
+    else:
+        result = _RE_CAMEL2.sub(r'\1_\2', _RE_CAMEL1.sub(r'\1_\2', name)).lower()
+    if suppress_new and result[:4] == "new_":
+        result = result[4:]
+    return result
+
+
+@functools.lru_cache(maxsize=128)
+def _create_mapping(keys, suppress_new):
+    """
+    Returns the auto-generated mapping of `ArgumentNamespace` for the
+    given tuple of source `keys`. Results of the same action have the
+    same keys, so the mapping is cached. The returned dictionary is
+    shared and must not get modified.
+    """
+    return {_rewrite_argument(key, suppress_new): key for key in keys}
+
+
+# method names of ArgumentNamespace not allowed as attribute names
+_RESERVED_NAMES = frozenset((
+    'get', 'items', 'keys', 'rewrite_argument', 'update', 'values'
+))
+
+
+def _check_names(names):
+    """
+    Raises a ValueError if one of the given `names` would shadow a
+    method of the dict-like interface of `ArgumentNamespace`.
+    """
+    reserved = _RESERVED_NAMES.intersection(names)
+    if reserved:
+        raise ValueError(
+            f"reserved names can not be used as attributes: "
+            f"{', '.join(sorted(reserved))}"
+        )
 
 
 class ArgumentNamespace(SimpleNamespace):
     """
-    Namespace object that also behaves like a dictionary, but is not
-    iterable.
+    Namespace object that also behaves like a dictionary.
 
     Usecase is as a wrapper for the dictionary returned from
     `FritzConnection.call_action()`. This dictionary has keys named
@@ -120,12 +168,18 @@ class ArgumentNamespace(SimpleNamespace):
         >>> info.up_time
         9516949
 
+    The names of the methods `get`, `items`, `keys`, `rewrite_argument`,
+    `update` and `values` are reserved and can not be used as attribute
+    names. Trying so on instanciation, item assignment or `update()`
+    will raise a `ValueError`. In this case use a `mapping` to provide
+    other names. (Assigning a reserved name as attribute is not checked
+    and will shadow the method.)
+
     """
     def __init__(self, source, mapping=None, suppress_new=True):
         if mapping is None:
-            mapping = {
-                self.rewrite_argument(key, suppress_new): key for key in source
-            }
+            mapping = _create_mapping(tuple(source), suppress_new)
+        _check_names(mapping)
         super().__init__(
             **{name: source[attribute] for name, attribute in mapping.items()}
         )
@@ -134,12 +188,56 @@ class ArgumentNamespace(SimpleNamespace):
         return getattr(self, key)
 
     def __setitem__(self, key, value):
+        _check_names((key,))
         setattr(self, key, value)
 
     def __len__(self):
         # should provide len() as dict-like object
         return len(self.__dict__)
 
+    def __contains__(self, key):
+        return key in self.__dict__
+
+    def __iter__(self):
+        # iterates over the attribute names like a dictionary
+        return iter(self.__dict__)
+
+    def get(self, key, default=None):
+        """
+        Returns the value of the attribute `key` or `default` if the
+        attribute does not exist.
+        """
+        return self.__dict__.get(key, default)
+
+    def keys(self):
+        """Returns a view on the attribute names like `dict.keys()`."""
+        return self.__dict__.keys()
+
+    def values(self):
+        """Returns a view on the attribute values like `dict.values()`."""
+        return self.__dict__.values()
+
+    def items(self):
+        """
+        Returns a view on the (name, value) pairs of the attributes like
+        `dict.items()`.
+        """
+        return self.__dict__.items()
+
+    def update(self, other=None, **kwargs):
+        """
+        Updates the instance like `dict.update()` with the items of
+        `other` (a dictionary, another `ArgumentNamespace` or an
+        iterable of key-value pairs) and the given keyword arguments.
+        """
+        attributes = self.__dict__
+        if other is not None:
+            other = other if isinstance(other, dict) else dict(other)
+            _check_names(other)
+            attributes.update(other)
+        _check_names(kwargs)
+        attributes.update(kwargs)
+
     @staticmethod
     def rewrite_argument(name, suppress_new=True):
         """
@@ -148,12 +246,4 @@ class ArgumentNamespace(SimpleNamespace):
         "new_" in case of AVM standard argument names. if `suppress_new`
         is `True` the prefix "new_" will get removed.
         """
-        new = "new_"
-        result = "".join(
-            f"_{char.lower()}" if char.isupper() else char for char in name
-        )
-        if result.startswith("_"):
-            result = result[1:]
-        if suppress_new and result.startswith(new):
-            result = result[len(new):]
-        return result
\ No newline at end of file
+        return _rewrite_argument(name, suppress_new)
\ No newline at end of file
@@ -6,14 +6,17 @@ Module to get information about WLAN devices.
 # License: MIT (https://opensource.org/licenses/MIT)
 # Author: Bernd Strebel, Klaus Bremer
 
+import functools
 import io
 import itertools
 import random
 import string
+import time
 
+from concurrent.futures import ThreadPoolExecutor
 from warnings import warn
 
-from ..core.exceptions import FritzServiceError
+from ..core.exceptions import FritzActionError, FritzServiceError
 from .fritzbase import AbstractLibraryBase
 
 try:
@@ -26,9 +29,33 @@ else:
 # important: don't set an extension number here:
 SERVICE = 'WLANConfiguration'
 DEFAULT_PASSWORD_LENGTH = 12
+# max. number of parallel requests for host informations
+# (connections exceeding the pool size of FritzConnection, which is 10
+# by default, are not reused):
+MAX_WORKERS = 8
+# seconds to reuse the result of get_info():
+INFO_CACHE_TIMEOUT = 1.0
 WPA_SECURITY = 'WPA'
 NO_PASS = 'nopass'
 
+# add just two human-readable special characters.
+# password strength increases with the length.
+# character permutations are: 64**length
+_PASSWORD_CHARS = string.ascii_letters + string.digits + "@#"
+
+# beacontypes without password protection:
+_UNSECURE_BEACONTYPES = frozenset(('None', 'OWETrans'))
+
+
+@functools.lru_cache(maxsize=16)
+def _secure_beacontypes(possible_beacontypes):
+    """
+    Returns a frozenset of the password protected beacontypes from the
+    comma separated string `possible_beacontypes` as reported by the
+    router. The string rarely changes, so the result is cached.
+    """
+    return frozenset(possible_beacontypes.split(",")) - _UNSECURE_BEACONTYPES
+
 
 def get_beacon_security(instance, security):
     """
@@ -44,8 +71,9 @@ def get_beacon_security(instance, security):
     """
     if not security:
         info = instance.get_info()
-        beacontypes = set(info["NewX_AVM-DE_PossibleBeaconTypes"].split(","))
-        beacontypes -= set(('None', 'OWETrans'))
+        beacontypes = _secure_beacontypes(
+            info["NewX_AVM-DE_PossibleBeaconTypes"]
+        )
         beacontype = info["NewBeaconType"]
         if beacontype in beacontypes:
             security = WPA_SECURITY
@@ -54,14 +82,14 @@ def get_beacon_security(instance, security):
     return security
 
 
-def get_wifi_qr_code(instance, kind='svg',
+def get_wifi_qr_code(instance, kind=None,
                      security=None, hidden=False,
-                     scale=4):
+                     scale=4, out=None):
     """
     Returns a file-like object providing a bytestring representing a
     qr-code for wlan access. `instance` is a FritzWLAN or FritzGuestWLAN
     instance. `kind` describes the type of the qr-code. Supported types
-    are: 'svg', 'png' and 'pdf'. Default is 'svg'.
+    are: 'svg', 'png' and 'pdf'. Default is 'svg' (but see `out` below).
 
     This function is not intended to get called directly. Instead it is
     available as a method on FritzWLAN instances (as well as on
@@ -100,10 +128,21 @@ def get_wifi_qr_code(instance, kind='svg',
 
     `scale` defines the size of the produced qr-code. Default value is 4.
 
+    If `out` is given, the qr-code is written directly to `out` (a
+    writable file like object opened in binary mode or a filename) which
+    is returned instead of a new stream: ::
+
+        with open('qr_code.png', 'wb') as fobj:
+            guest_wlan.get_wifi_qr_code(kind='png', out=fobj)
+
+    In case `out` is a filename and `kind` is not given, the kind is
+    taken from the suffix of the filename: ::
+
+        guest_wlan.get_wifi_qr_code(out='qr_code.png')
+
     .. versionadded:: development
 
     """
-    stream = io.BytesIO()
     security = get_beacon_security(instance, security)
     qr_code = segno.helpers.make_wifi(
         ssid=instance.ssid,
@@ -111,7 +150,14 @@ def get_wifi_qr_code(instance, kind='svg',
         security=security,
         hidden=hidden
     )
-    qr_code.save(out=stream, kind=kind, scale=scale)
+    if out is not None:
+        if kind is None and hasattr(out, 'write'):
+            kind = 'svg'
+        # for filenames segno takes the kind from the suffix:
+        qr_code.save(out=out, kind=kind, scale=scale)
+        return out
+    stream = io.BytesIO()
+    qr_code.save(out=stream, kind=kind or 'svg', scale=scale)
     stream.seek(0)
     return stream
 
@@ -140,9 +186,25 @@ class FritzWLAN(AbstractLibraryBase):
         super().__init__(*args, **kwargs)
         self.service = service
 
+    @property
+    def service(self):
+        """
+        The number of the WLANConfiguration in use. Can get set to
+        switch to another WLANConfiguration.
+        """
+        return self._service
+
+    @service.setter
+    def service(self, value):
+        self._service = value
+        self._service_name = f'{SERVICE}{value}'
+        self._info_cache = (0.0, None)
+
     def _action(self, actionname, **kwargs):
-        service = f'{SERVICE}{self.service}'
-        return self.fc.call_action(service, actionname, **kwargs)
+        if actionname.startswith('Set'):
+            # settings may change the result of get_info()
+            self._info_cache = (0.0, None)
+        return self.fc.call_action(self._service_name, actionname, **kwargs)
 
     @property
     def host_number(self):
@@ -160,14 +222,14 @@ class FritzWLAN(AbstractLibraryBase):
         for all WLANConfigurations.
         """
         total = 0
-        _service = self.service
         for service in itertools.count(1):
-            self.service = service
             try:
-                total += self.host_number
+                result = self.fc.call_action(
+                    f'{SERVICE}{service}', 'GetTotalAssociations'
+                )
             except FritzServiceError:
                 break
-        self.service = _service
+            total += result['NewTotalAssociations']
         return total
 
     @property
@@ -246,19 +308,43 @@ class FritzWLAN(AbstractLibraryBase):
         )
         return result
 
+    def _get_host_entry(self, index):
+        """
+        Returns the result of `get_generic_host_entry()` for the given
+        'index' or None if there is no entry at this position.
+        """
+        try:
+            return self.get_generic_host_entry(index)
+        except IndexError:
+            return None
+
     def get_hosts_info(self):
         """
         Returns a list of dictionaries with information about the known
         hosts. The dict-keys are: 'service', 'index', 'status', 'mac',
         'ip', 'signal', 'speed'
         """
-        information = []
-        for index in itertools.count():
-            try:
-                host = self.get_generic_host_entry(index)
-            except IndexError:
-                break
-            information.append({
+        try:
+            host_number = self.host_number
+        except FritzActionError:
+            host_number = None
+        if host_number is None:
+            # unknown number of hosts: fall back to serial requests
+            hosts = map(self._get_host_entry, itertools.count())
+        elif host_number > 1:
+            # the requests are latency bound, so run them in parallel
+            workers = min(MAX_WORKERS, host_number)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                hosts = list(
+                    executor.map(self._get_host_entry, range(host_number))
+                )
+        else:
+            # not worth to start a thread
+            hosts = map(self._get_host_entry, range(host_number))
+        # hosts may have left the network in the meantime:
+        hosts = itertools.takewhile(lambda host: host is not None, hosts)
+        return [
+            {
                 'service': self.service,
                 'index': index,
                 'status': host['NewAssociatedDeviceAuthState'],
@@ -266,15 +352,29 @@ class FritzWLAN(AbstractLibraryBase):
                 'ip': host['NewAssociatedDeviceIPAddress'],
                 'signal': host['NewX_AVM-DE_SignalStrength'],
                 'speed': host['NewX_AVM-DE_Speed']
-            })
-        return information
+            }
+            for index, host in enumerate(hosts)
+        ]
 
-    def get_info(self):
+    def get_info(self, refresh=False):
         """
         Returns a dictionary with general internal information about
         the current wlan network according to the AVM documentation.
+
+        .. versionchanged:: development
+
+        The result is reused for `INFO_CACHE_TIMEOUT` seconds (or until
+        a setting gets changed by this instance). The new parameter
+        `refresh` can get set to `True` to request the information from
+        the router in any case. Every call returns a new dictionary.
         """
-        return self._action("GetInfo")
+        timestamp, info = self._info_cache
+        expired = time.monotonic() - timestamp >= INFO_CACHE_TIMEOUT
+        if refresh or expired or info is None:
+            info = self._action("GetInfo")
+            self._info_cache = (time.monotonic(), info)
+        # don't expose the cached dictionary to modifications:
+        return dict(info)
 
     @property
     def is_enabled(self):
@@ -323,20 +423,16 @@ class FritzWLAN(AbstractLibraryBase):
         at time of writing.
         """
         info = self.get_info()
-        characters = info["NewAllowedCharsPSK"]
+        characters = info["NewAllowedCharsPSK"].upper()
         length = info["NewMaxCharsPSK"]
-        return "".join(random.choices(characters, k=length)).upper()
+        return "".join(random.choices(characters, k=length))
 
     @staticmethod
     def _create_password(length):
         """
         Returns a human-readable password with the given length.
         """
-        # add just two human-readable special characters.
-        # password strength increases with the length.
-        # character permutations are: 64**length
-        characters = string.ascii_letters + string.digits + "@#"
-        return "".join(random.choices(characters, k=length))
+        return "".join(random.choices(_PASSWORD_CHARS, k=length))
 
 
 class FritzGuestWLAN(FritzWLAN):
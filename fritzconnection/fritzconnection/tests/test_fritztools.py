@@ -3,7 +3,9 @@ import pytest
 from ..lib.fritztools import (
     ArgumentNamespace,
     byte_formatter,
+    format_dB,
     format_num,
+    format_rate,
 )
 
 
@@ -11,6 +13,10 @@ from ..lib.fritztools import (
     "value, result, dimension", [
         (1, 1.0, 'B'),
         (123, 123.0, 'B'),
+        (999, 999.0, 'B'),
+        (1000, 1.0, 'KB'),
+        (999999, 999.999, 'KB'),
+        (1000000, 1.0, 'MB'),
         (1230, 1.230, 'KB'),
         (12345, 12.345, 'KB'),
         (242981246, 242.981246, 'MB'),
@@ -60,6 +66,29 @@ def test_format_num_bits():
     assert result == '1.2 KBit'
 
 
+@pytest.mark.parametrize(
+    "num, unit, formated_rate", [
+        (300, 'bytes', '300.0 B/s'),
+        (3500, 'bytes', '3.5 KB/s'),
+        (1234, 'bits', '1.2 KBit/s'),
+        (45e6, 'bits', '45.0 MBit/s'),
+    ]
+)
+def test_format_rate(num, unit, formated_rate):
+    assert formated_rate == format_rate(num, unit=unit)
+
+
+@pytest.mark.parametrize(
+    "num, formated_db", [
+        (0, '0.0 dB'),
+        (123, '12.3 dB'),
+        (-45, '-4.5 dB'),
+    ]
+)
+def test_format_dB(num, formated_db):
+    assert formated_db == format_dB(num)
+
+
 def test_argument_namespace():
     source = {
         'NewManufacturerName': 'AVM',
@@ -91,6 +120,8 @@ def test_argument_namespace():
         ("ModelName", "model_name"),
         ("NewUpTime", "new_up_time"),
         ("new_up_time", "new_up_time"),
+        ("NewSSID", "new_ssid"),
+        ("NewMACAddress", "new_mac_address"),
     ]
 )
 def test_argument_namespace_rewrite(name, expected_result):
@@ -108,6 +139,8 @@ def test_argument_namespace_rewrite(name, expected_result):
         ("newuptime", "newuptime"),
         ("Newuptime", "newuptime"),
         ("New_uptime", "uptime"),
+        ("NewÉtat", "newétat"),
+        ("newÉtat", "newétat"),
     ]
 )
 def test_argument_namespace_rewrite_no_new(name, expected_result):
@@ -150,6 +183,20 @@ def test_argument_namespace_no_mapping_no_suppress(avm_source):
     assert info['new_model_name'] == 'FRITZ!Box 7590'
 
 
+def test_argument_namespace_cached_mapping(avm_source):
+    """
+    Instances created from sources with the same keys should share the
+    auto-generated mapping, but respect the `suppress_new` setting.
+    """
+    info = ArgumentNamespace(avm_source)
+    info_new = ArgumentNamespace(avm_source, suppress_new=False)
+    info_again = ArgumentNamespace(dict(avm_source))
+    assert info.model_name == 'FRITZ!Box 7590'
+    assert info_new.new_model_name == 'FRITZ!Box 7590'
+    assert info_again.model_name == 'FRITZ!Box 7590'
+    assert 'new_model_name' not in info_again.__dict__
+
+
 def test_argument_namespace_has_len(avm_source):
     info = ArgumentNamespace(avm_source)
     assert len(info) == len(avm_source)
@@ -164,3 +211,79 @@ def test_argument_namespace_assignment(avm_source):
     assert info["minus"] == -3
     assert info.minus == -3
     assert len(info) == len(avm_source) + 2
+
+
+def test_argument_namespace_update(avm_source):
+    info = ArgumentNamespace(avm_source)
+    info.update({"model_name": "FRITZ!Box 7490", "answer": 42}, minus=-3)
+    assert info.model_name == "FRITZ!Box 7490"
+    assert info["answer"] == 42
+    assert info.minus == -3
+    assert len(info) == len(avm_source) + 2
+    other = ArgumentNamespace({"NewSerialNumber": "123"})
+    info.update(other)
+    assert info.serial_number == "123"
+    assert len(info) == len(avm_source) + 2
+    info.update([("answer", 21), ("pairs", True)])
+    assert info.answer == 21
+    assert info.pairs is True
+
+
+def test_argument_namespace_views(avm_source):
+    info = ArgumentNamespace(avm_source)
+    assert list(info.keys()) == [
+        "model_name", "description", "product_class", "serial_number"
+    ]
+    assert list(info.values()) == list(avm_source.values())
+    assert dict(info.items()) == dict(zip(info.keys(), info.values()))
+    # views are live
+    keys = info.keys()
+    info.answer = 42
+    assert "answer" in keys
+    assert dict(info)["answer"] == 42
+
+
+def test_argument_namespace_dict_access(avm_source):
+    info = ArgumentNamespace(avm_source)
+    assert "model_name" in info
+    assert "modelname" not in info
+    assert info.get("serial_number") == '989BCB2B93B0'
+    assert info.get("modelname") is None
+    assert info.get("modelname", "unknown") == "unknown"
+    assert list(info) == list(info.keys())
+
+
+def test_argument_namespace_reserved_names(avm_source):
+    """
+    Attributes must not shadow the methods of the dict-like interface.
+    """
+    with pytest.raises(ValueError):
+        ArgumentNamespace({'NewKeys': 1})
+    with pytest.raises(ValueError):
+        ArgumentNamespace(avm_source, mapping={'items': 'NewModelName'})
+    info = ArgumentNamespace(avm_source)
+    with pytest.raises(ValueError):
+        info['get'] = 1
+    with pytest.raises(ValueError):
+        info.update({'update': 1})
+    with pytest.raises(ValueError):
+        info.update(keys=1)
+    assert dict(info) == dict(info.items())
+    # a mapping allows to rename reserved names:
+    info = ArgumentNamespace({'NewKeys': 1}, mapping={'key_number': 'NewKeys'})
+    assert dict(info) == {'key_number': 1}
+
+
+def test_argument_namespace_private_names():
+    """
+    Private names from the source must not break the checks for the
+    reserved names.
+    """
+    info = ArgumentNamespace({'_check_names': 1, 'NewUpTime': 2})
+    info.answer = 42
+    info.update(minus=-3)
+    info['plus'] = 3
+    assert info._check_names == 1
+    assert dict(info) == {
+        '_check_names': 1, 'up_time': 2, 'answer': 42, 'minus': -3, 'plus': 3
+    }
@@ -9,14 +9,27 @@ import tempfile
 import pytest
 
 try:
-    import cv2
     import segno.helpers
 except ImportError:
+    SEGNO_NOT_AVAILABLE = True
     OPENCV_NOT_AVAILABLE = True
 else:
-    OPENCV_NOT_AVAILABLE = False
+    SEGNO_NOT_AVAILABLE = False
+    try:
+        import cv2
+    except ImportError:
+        OPENCV_NOT_AVAILABLE = True
+    else:
+        OPENCV_NOT_AVAILABLE = False
 
+from fritzconnection.core.exceptions import (
+    FritzActionError,
+    FritzArrayIndexError,
+    FritzServiceError,
+)
+from fritzconnection.lib import fritzwlan
 from fritzconnection.lib.fritzwlan import (
+    FritzWLAN,
     get_beacon_security,
     get_wifi_qr_code,
 )
@@ -179,3 +192,276 @@ def test_get_wifi_qr_code(current_beacontype, security, expected_security):
     result = get_content_from_qr_file(fname)
     os.unlink(fname)  # do this asap
     assert result == expected_result
+
+
+@pytest.mark.skipif(SEGNO_NOT_AVAILABLE, reason="requires segno")
+def test_get_wifi_qr_code_out():
+    """
+    If `out` is given the qr-code must get written to `out` and `out`
+    is returned.
+    """
+    mock_data = {
+        'NewBeaconType': '11i',
+        'NewX_AVM-DE_PossibleBeaconTypes': 'None,11i,WPAand11i,11iandWPA3',
+        'NewSSID': 'the_wlan_name',
+        'NewKeyPassphrase': 'the_password',
+    }
+    instance = WLANConfigMock(mock_data)
+    stream = get_wifi_qr_code(instance, kind="png")
+    out = io.BytesIO()
+    result = get_wifi_qr_code(instance, kind="png", out=out)
+    assert result is out
+    assert out.getvalue() == stream.read()
+
+
+@pytest.mark.skipif(SEGNO_NOT_AVAILABLE, reason="requires segno")
+@pytest.mark.parametrize(
+    "filename, kind, expected_start", [
+        ('qr_code.png', None, b'\x89PNG'),
+        ('qr_code.svg', None, b'<?xml'),
+        ('qr_code.data', 'png', b'\x89PNG'),
+    ]
+)
+def test_get_wifi_qr_code_out_filename(filename, kind, expected_start, tmp_path):
+    """
+    If `out` is a filename the kind of the qr-code should match the
+    suffix of the filename, unless `kind` is given.
+    """
+    mock_data = {
+        'NewBeaconType': '11i',
+        'NewX_AVM-DE_PossibleBeaconTypes': 'None,11i,WPAand11i,11iandWPA3',
+        'NewSSID': 'the_wlan_name',
+        'NewKeyPassphrase': 'the_password',
+    }
+    instance = WLANConfigMock(mock_data)
+    fname = str(tmp_path / filename)
+    result = get_wifi_qr_code(instance, kind=kind, out=fname)
+    assert result == fname
+    with open(fname, 'rb') as fobj:
+        assert fobj.read().startswith(expected_start)
+
+
+class FritzConnectionMock:
+    """
+    Mocking class for a FritzConnection instance. `results` is a
+    dictionary with action names as keys and the results of
+    call_action() as values. If a result is callable, it gets called
+    with the service name and the action arguments and the return value
+    is the result. All calls are recorded as (service_name, action_name)
+    tuples in `calls`.
+    """
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    def call_action(self, service_name, action_name, **kwargs):
+        self.calls.append((service_name, action_name))
+        result = self.results[action_name]
+        if callable(result):
+            return result(service_name, **kwargs)
+        return result
+
+    def count(self, action_name):
+        """Returns the number of calls of the given action."""
+        return [action for _, action in self.calls].count(action_name)
+
+
+def get_hosts_results(macs, host_number=None):
+    """
+    Returns the results for a FritzConnectionMock providing the actions
+    to read the associated devices given by `macs`. `host_number` is
+    the reported number of devices, which defaults to the length of
+    `macs`. If `host_number` is False, the number is not available.
+    """
+    if host_number is None:
+        host_number = len(macs)
+
+    def get_total_associations(service_name):
+        if host_number is False:
+            raise FritzActionError()
+        return {'NewTotalAssociations': host_number}
+
+    def get_generic_info(service_name, NewAssociatedDeviceIndex):
+        try:
+            mac = macs[NewAssociatedDeviceIndex]
+        except IndexError:
+            raise FritzArrayIndexError()
+        return {
+            'NewAssociatedDeviceAuthState': True,
+            'NewAssociatedDeviceMACAddress': mac,
+            'NewAssociatedDeviceIPAddress':
+                f'192.168.178.{NewAssociatedDeviceIndex + 10}',
+            'NewX_AVM-DE_SignalStrength': 50,
+            'NewX_AVM-DE_Speed': 866,
+        }
+
+    return {
+        'GetTotalAssociations': get_total_associations,
+        'GetGenericAssociatedDeviceInfo': get_generic_info,
+    }
+
+
+def test_fritzwlan_service_name():
+    """
+    Changing the service of a FritzWLAN instance must change the
+    WLANConfiguration used for the actions.
+    """
+    fc = FritzConnectionMock({'GetSSID': {'NewSSID': 'the_wlan_name'}})
+    wlan = FritzWLAN(fc)
+    assert wlan.ssid == 'the_wlan_name'
+    wlan.service = 3
+    assert wlan.service == 3
+    assert wlan.ssid == 'the_wlan_name'
+    assert fc.calls == [
+        ('WLANConfiguration1', 'GetSSID'),
+        ('WLANConfiguration3', 'GetSSID'),
+    ]
+
+
+class Clock:
+    """Replacement for time.monotonic() with a manually set time."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    """Provides a Clock instance used by the fritzwlan module."""
+    clock = Clock()
+    monkeypatch.setattr(fritzwlan.time, 'monotonic', clock)
+    return clock
+
+
+def test_fritzwlan_get_info_cache(clock):
+    """
+    get_info() should reuse the last result unless a refresh is
+    requested, a setting is changed, the service is switched or the
+    cache has expired.
+    """
+    fc = FritzConnectionMock({
+        'GetInfo': {'NewEnable': True, 'NewBeaconType': '11i'},
+        'SetEnable': {},
+    })
+    wlan = FritzWLAN(fc)
+    assert wlan.is_enabled is True
+    assert wlan.beacontype == '11i'
+    assert fc.count('GetInfo') == 1
+    wlan.get_info(refresh=True)
+    assert fc.count('GetInfo') == 2
+    wlan.disable()
+    wlan.get_info()
+    assert fc.count('GetInfo') == 3
+    wlan.service = 2
+    wlan.get_info()
+    assert fc.count('GetInfo') == 4
+    clock.now += fritzwlan.INFO_CACHE_TIMEOUT / 2
+    wlan.get_info()
+    assert fc.count('GetInfo') == 4
+    clock.now += fritzwlan.INFO_CACHE_TIMEOUT
+    wlan.get_info()
+    assert fc.count('GetInfo') == 5
+
+
+def test_fritzwlan_get_info_copy(clock):
+    """
+    Modifying the result of get_info() must not change the cached
+    information.
+    """
+    fc = FritzConnectionMock({'GetInfo': {'NewEnable': True}})
+    wlan = FritzWLAN(fc)
+    info = wlan.get_info()
+    info['NewEnable'] = False
+    assert wlan.is_enabled is True
+    assert fc.count('GetInfo') == 1
+
+
+def test_fritzwlan_total_host_number():
+    associations = {
+        'WLANConfiguration1': 3,
+        'WLANConfiguration2': 5,
+        'WLANConfiguration3': 1,
+    }
+
+    def get_total_associations(service_name):
+        try:
+            return {'NewTotalAssociations': associations[service_name]}
+        except KeyError:
+            raise FritzServiceError(f'unknown service: "{service_name}"')
+
+    fc = FritzConnectionMock({'GetTotalAssociations': get_total_associations})
+    wlan = FritzWLAN(fc, service=2)
+    assert wlan.total_host_number == 9
+    assert wlan.service == 2
+
+
+@pytest.mark.parametrize("host_number", [0, 1, 20])
+def test_fritzwlan_get_hosts_info(host_number):
+    """
+    The hosts must be reported in order of their index.
+    """
+    macs = [f'00:00:00:00:00:{index:02d}' for index in range(host_number)]
+    fc = FritzConnectionMock(get_hosts_results(macs))
+    hosts_info = FritzWLAN(fc).get_hosts_info()
+    assert [host['mac'] for host in hosts_info] == macs
+    assert [host['index'] for host in hosts_info] == list(range(host_number))
+
+
+@pytest.mark.parametrize("host_number", [False, 3, 5])
+def test_fritzwlan_get_hosts_info_host_number(host_number):
+    """
+    If the number of hosts is unknown or outdated (hosts have left the
+    network in the meantime), the available hosts must get reported.
+    """
+    macs = [f'00:00:00:00:00:{index:02d}' for index in range(3)]
+    fc = FritzConnectionMock(get_hosts_results(macs, host_number))
+    hosts_info = FritzWLAN(fc).get_hosts_info()
+    assert [host['mac'] for host in hosts_info] == macs
+
+
+@pytest.mark.parametrize(
+    "host_number, expected_workers", [
+        (0, []),
+        (1, []),
+        (2, [2]),
+        (20, [fritzwlan.MAX_WORKERS]),
+    ]
+)
+def test_fritzwlan_get_hosts_info_workers(
+    host_number, expected_workers, monkeypatch
+):
+    """
+    No threads should get started for less than two hosts and not more
+    threads than hosts.
+    """
+    workers = []
+
+    class RecordingExecutor(fritzwlan.ThreadPoolExecutor):
+        def __init__(self, max_workers):
+            workers.append(max_workers)
+            super().__init__(max_workers=max_workers)
+
+    monkeypatch.setattr(fritzwlan, 'ThreadPoolExecutor', RecordingExecutor)
+    macs = [f'00:00:00:00:00:{index:02d}' for index in range(host_number)]
+    fc = FritzConnectionMock(get_hosts_results(macs))
+    hosts_info = FritzWLAN(fc).get_hosts_info()
+    assert len(hosts_info) == host_number
+    assert workers == expected_workers
+
+
+def test_fritzwlan_get_hosts_info_service_error():
+    """
+    Errors other than a missing action must not trigger the serial
+    fallback but get raised at once.
+    """
+    def get_total_associations(service_name):
+        raise FritzServiceError(f'unknown service: "{service_name}"')
+
+    fc = FritzConnectionMock({'GetTotalAssociations': get_total_associations})
+    with pytest.raises(FritzServiceError):
+        FritzWLAN(fc).get_hosts_info()
+    assert fc.calls == [('WLANConfiguration1', 'GetTotalAssociations')]